@@ -0,0 +1,132 @@
+"""Micro-benchmarks for tchan's parsing code
+
+Run with `python bench_tchan.py` (or `make bench`). Pages are built from the
+same HTML used by the tests (`test_tchan.py`).
+"""
+import gc
+import timeit
+import tracemalloc
+from dataclasses import asdict
+
+from lxml.html import document_fromstring
+
+from tchan import (
+    MESSAGE_FIELDS,
+    ChannelMessage,
+    CompactChannelMessage,
+    _MessageColumns,
+    _parse_messages_page,
+    parse_html,
+    parse_messages,
+)
+from test_tchan import make_channel_pages
+
+URL = "https://t.me/s/chan"
+
+
+def bench(name, function, number, pages=1):
+    seconds = min(timeit.repeat(function, number=number, repeat=5))
+    seconds /= number * pages
+    print(f"{name:<40} {seconds * 1_000_000:10.1f} µs/page")
+    return seconds
+
+
+def bench_text_vs_bytes():
+    "`document_fromstring(response.text)` vs. `parse_html(response.content)`"
+    pages = list(make_channel_pages("chan", 100).values())[:20]
+    for description, replacement in (
+        ("ASCII-only", "Message"),
+        ("non-ASCII", "Сообщение 👍 Mensagem"),
+    ):
+        contents = [
+            html.replace("Message", replacement).encode("utf-8")
+            for html in pages
+        ]
+
+        def text_path():
+            for content in contents:
+                # `response.text` decodes the body using the charset from headers
+                document_fromstring(content.decode("utf-8"))
+
+        def bytes_path():
+            for content in contents:
+                parse_html(content)
+
+        print(f"Building the tree of {len(contents)} pages ({description} text):")
+        text = bench("  from text (str)", text_path, 20, len(contents))
+        binary = bench(
+            "  from bytes (reused UTF-8 parser)", bytes_path, 20, len(contents)
+        )
+        print(f"  speedup: {text / binary:.2f}x")
+
+
+def bench_parsers():
+    "`parse_messages` engines"
+    tree = parse_html(make_channel_pages("chan", 20)["/s/chan"].encode("utf-8"))
+    print("Parsing messages of a 20-message page:")
+    for parser in ("xpath", "single-pass"):
+        bench(
+            f"  parser={parser}",
+            lambda: list(parse_messages(URL, tree, parser=parser)),
+            number=50,
+        )
+
+
+def bench_columns():
+    "Message objects pivoted to columns vs. `_MessageColumns`"
+    content = make_channel_pages("chan", 20)["/s/chan"].encode("utf-8")
+    print("Building columns from a 20-message page:")
+
+    def from_objects():
+        messages = _parse_messages_page(URL, content)[0]
+        columns = {name: [] for name in MESSAGE_FIELDS}
+        for message in messages:
+            for name, column in columns.items():
+                column.append(getattr(message, name))
+
+    def from_columns():
+        _parse_messages_page(URL, content, "xpath", _MessageColumns())
+
+    bench("  ChannelMessage objects + pivot", from_objects, number=50)
+    bench("  messages_batches (_MessageColumns)", from_columns, number=50)
+
+
+def bench_message_memory(count=1_000_000):
+    "Memory used by `ChannelMessage` vs. `CompactChannelMessage`"
+    tree = parse_html(make_channel_pages("chan", 20)["/s/chan"].encode("utf-8"))
+    templates = [asdict(message) for message in parse_messages(URL, tree)]
+    print(f"Memory used by {count:,} messages:")
+    results = {}
+    for message_class in (ChannelMessage, CompactChannelMessage):
+        gc.collect()
+        tracemalloc.start()
+        messages = []
+        for index in range(count):
+            values = templates[index % len(templates)]
+            # New `str` objects (as if they came from different pages)
+            messages.append(
+                message_class(
+                    **{
+                        **values,
+                        "id": index,
+                        "type": "".join(values["type"]),
+                        "channel": "".join(values["channel"]),
+                        "text": f"{values['text']} {index}",
+                        "urls": list(values["urls"]),
+                    }
+                )
+            )
+        used, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del messages
+        results[message_class] = used / count
+        print(f"  {message_class.__name__:<38} {used / count:10.1f} bytes/message")
+    ratio = results[ChannelMessage] / results[CompactChannelMessage]
+    print(f"  reduction: {ratio:.2f}x")
+
+
+if __name__ == "__main__":
+    bench_text_vs_bytes()
+    bench_parsers()
+    bench_columns()
+    bench_message_memory()